@@ -103,7 +103,7 @@ async def register(
         HTTPException: If email already exists
     """
     # Check if user already exists
-    result = await db.execute(select(User).where(User.email == user_data.email))
+    result = await db.execute(select(User.id).where(User.email == user_data.email))
     if result.scalar_one_or_none():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -140,7 +140,7 @@ async def register(
         access_token=access_token,
         token_type="bearer",
         expires_in=settings.access_token_expire_minutes * 60,
-        user=UserResponse.from_orm(db_user)
+        user=UserResponse.from_orm_fast(db_user)
     )
 
 
@@ -193,7 +193,7 @@ async def login_for_access_token(
         access_token=access_token,
         token_type="bearer",
         expires_in=settings.access_token_expire_minutes * 60,
-        user=UserResponse.from_orm(user)
+        user=UserResponse.from_orm_fast(user)
     )
 
 
@@ -242,7 +242,7 @@ async def login(
         access_token=access_token,
         token_type="bearer",
         expires_in=settings.access_token_expire_minutes * 60,
-        user=UserResponse.from_orm(user)
+        user=UserResponse.from_orm_fast(user)
     )
 
 
@@ -257,9 +257,7 @@ async def read_users_me(current_user: User = Depends(get_current_active_user)):
     Returns:
         User information
     """
-    user_response = UserResponse.from_orm(current_user)
-    user_response.has_plaid_connection = bool(current_user.plaid_access_token)
-    return user_response
+    return UserResponse.from_orm_fast(current_user)
 
 
 @router.post("/refresh", response_model=Token)
@@ -283,8 +281,7 @@ async def refresh_token(current_user: User = Depends(get_current_active_user)):
         # Update last login time
         current_user.last_login = datetime.utcnow()
         
-        user_response = UserResponse.from_orm(current_user)
-        user_response.has_plaid_connection = bool(current_user.plaid_access_token)
+        user_response = UserResponse.from_orm_fast(current_user)
         
         return Token(
             access_token=access_token,
@@ -316,15 +313,15 @@ async def request_password_reset(
         Success message
     """
     # Check if user exists
-    result = await db.execute(select(User).where(User.email == reset_data.email))
-    user = result.scalar_one_or_none()
+    result = await db.execute(select(User.email).where(User.email == reset_data.email))
+    email = result.scalar_one_or_none()
     
-    if not user:
+    if not email:
         # Don't reveal if email exists or not for security
         return {"message": "If the email exists, a password reset link has been sent"}
     
     # Generate reset token
-    reset_token = generate_password_reset_token(user.email)
+    reset_token = generate_password_reset_token(email)
     
     # In production, send email with reset link
     # For now, just return the token (remove this in production)
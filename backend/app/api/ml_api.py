@@ -3,7 +3,7 @@ Machine Learning API endpoints for forecasting and insights.
 """
 
 from typing import List, Dict, Any
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.session import get_db
 from app.api.auth import get_current_active_user
@@ -20,7 +20,7 @@ router = APIRouter()
 async def get_spending_forecast(
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db),
-    days_ahead: int = 30
+    days_ahead: int = Query(30, ge=1, le=365)
 ):
     """Get spending forecast for the user."""
     try:
@@ -2,11 +2,12 @@
 Plaid API endpoints for bank account connection and data synchronization.
 """
 
+import logging
 from typing import Dict, Any
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
-from app.db.session import get_db
+from app.db.session import AsyncSessionLocal, get_db
 from app.api.auth import get_current_active_user
 from app.models.user import User
 from app.schemas.user import PlaidConnection
@@ -14,6 +15,8 @@ from app.schemas.transaction import AccountResponse, TransactionResponse
 from app.services.plaid import plaid_service
 from app.core.security import encrypt_plaid_token, decrypt_plaid_token
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 
@@ -34,9 +37,16 @@ class PublicTokenExchange(BaseModel):
     institution_name: str
 
 
-class SyncRequest(BaseModel):
-    """Schema for manual sync request."""
-    days_back: int = 30
+async def initial_transaction_sync(user_id, access_token: str):
+    """Pull a newly connected item's transaction history in the background."""
+    # Runs after the response is sent, so it needs its own session
+    async with AsyncSessionLocal() as db:
+        try:
+            user = await db.get(User, user_id)
+            if user:
+                await plaid_service.sync_user_transactions(db, user, access_token)
+        except Exception as e:
+            logger.error(f"Initial transaction sync failed for user {user_id}: {e}")
 
 
 @router.post("/create-link-token", response_model=LinkTokenResponse)
@@ -70,14 +80,19 @@ async def create_link_token(
 @router.post("/exchange-public-token")
 async def exchange_public_token(
     token_data: PublicTokenExchange,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Exchange public token for access token and connect user's bank account.
     
+    Accounts are synced before responding; the transaction history, which can
+    take several seconds to pull, is synced in the background afterwards.
+    
     Args:
         token_data: Public token exchange data
+        background_tasks: Tasks run after the response is sent
         current_user: Current authenticated user
         db: Database session
     
@@ -91,16 +106,21 @@ async def exchange_public_token(
         # Encrypt and store access token
         encrypted_token = encrypt_plaid_token(access_token)
         current_user.plaid_access_token = encrypted_token
-        
-        # Store institution information
-        # Note: In a real app, you might want to create an Institution model
-        # For now, we'll store basic info in user metadata
+        current_user.plaid_transactions_cursor = None
         
         await db.commit()
         
-        # Sync accounts immediately after connection
-        decrypted_token = decrypt_plaid_token(encrypted_token)
-        accounts = await plaid_service.sync_user_accounts(db, current_user, decrypted_token)
+        # Sync accounts immediately after connection, recording the institution
+        # on each account so status checks never need to ask Plaid for it
+        accounts = await plaid_service.sync_user_accounts(
+            db,
+            current_user,
+            access_token,
+            institution_id=token_data.institution_id,
+            institution_name=token_data.institution_name
+        )
+        
+        background_tasks.add_task(initial_transaction_sync, current_user.id, access_token)
         
         return {
             "message": "Bank account connected successfully",
@@ -146,25 +166,35 @@ async def get_connection_status(
             from sqlalchemy import func
             from app.models.account import Account
             
+            # Institution of the most recently synced account, fetched in the same round trip
+            latest_institution = (
+                select(Account.institution_name)
+                .where(Account.user_id == current_user.id)
+                .order_by(Account.last_sync.desc().nulls_last())
+                .limit(1)
+                .correlate(None)
+                .scalar_subquery()
+            )
             result = await db.execute(
-                select(func.count(Account.id)).where(Account.user_id == current_user.id)
+                select(
+                    func.count(Account.id),
+                    func.max(Account.last_sync),
+                    latest_institution
+                ).where(Account.user_id == current_user.id)
             )
-            accounts_count = result.scalar() or 0
+            accounts_count, last_sync, institution_name = result.one()
             
             logger.info(f"Found {accounts_count} accounts for user")
             
-            # Get most recent sync time
-            sync_result = await db.execute(
-                select(func.max(Account.last_sync)).where(Account.user_id == current_user.id)
-            )
-            last_sync = sync_result.scalar()
-            
             logger.info(f"Connection status returning: is_connected=True, accounts_count={accounts_count}")
             
             return PlaidConnection(
                 is_connected=True,
+                institution_name=institution_name,
                 accounts_count=accounts_count,
-                last_sync=last_sync
+                last_sync=last_sync,
+                # The sync cursor is stored once the background sync has run
+                transactions_synced=bool(current_user.plaid_transactions_cursor)
             )
         else:
             logger.info(f"Connection status returning: is_connected=False")
@@ -221,15 +251,13 @@ async def sync_accounts(
 
 @router.post("/sync-transactions")
 async def sync_transactions(
-    sync_data: SyncRequest,
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Manually sync user's transactions.
+    Manually sync user's transactions changed since the last sync.
     
     Args:
-        sync_data: Sync configuration
         current_user: Current authenticated user
         db: Database session
     
@@ -244,14 +272,13 @@ async def sync_transactions(
     
     try:
         access_token = decrypt_plaid_token(current_user.plaid_access_token)
-        transactions = await plaid_service.sync_user_transactions(
-            db, current_user, access_token, sync_data.days_back
+        transaction_ids = await plaid_service.sync_user_transactions(
+            db, current_user, access_token
         )
         
         return {
             "message": "Transactions synced successfully",
-            "transactions_synced": len(transactions),
-            "days_back": sync_data.days_back
+            "transactions_synced": len(transaction_ids)
         }
         
     except Exception as e:
@@ -280,6 +307,7 @@ async def disconnect_plaid(
         # Remove Plaid access token
         current_user.plaid_access_token = None
         current_user.plaid_item_id = None
+        current_user.plaid_transactions_cursor = None
         
         # Optionally, you might want to deactivate accounts instead of keeping them
         # For now, we'll keep the accounts and transactions for historical data
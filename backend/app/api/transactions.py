@@ -2,6 +2,8 @@
 Transaction management API endpoints.
 """
 
+import re
+from functools import lru_cache
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -22,6 +24,34 @@ from app.schemas.transaction import (
 
 router = APIRouter()
 
+# Keyword groups for categorizing transactions by name, in priority order
+CATEGORY_KEYWORDS = (
+    ("Food & Dining", ('mcdonald', 'starbucks', 'restaurant', 'cafe', 'pizza', 'burger', 'food', 'dining', 'grubhub', 'doordash', 'uber eats', 'postmates')),
+    ("Transportation", ('uber', 'lyft', 'taxi', 'gas', 'shell', 'exxon', 'chevron', 'bp', 'parking', 'toll', 'metro', 'bus', 'train', 'airline')),
+    ("Shopping", ('amazon', 'walmart', 'target', 'costco', 'best buy', 'home depot', 'lowes', 'macy', 'nordstrom', 'shop')),
+    ("Entertainment", ('netflix', 'spotify', 'hulu', 'disney', 'movie', 'theater', 'concert', 'game', 'steam', 'playstation')),
+    ("Health & Fitness", ('gym', 'fitness', 'pharmacy', 'cvs', 'walgreens', 'doctor', 'medical', 'dental', 'vision', 'health')),
+    ("Utilities & Bills", ('electric', 'gas bill', 'water', 'internet', 'phone', 'cable', 'at&t', 'verizon', 'comcast', 'spectrum')),
+    ("Banking & Finance", ('bank', 'atm', 'credit card', 'loan', 'mortgage', 'insurance')),
+    ("Income", ('deposit', 'salary', 'payroll', 'refund', 'transfer in')),
+)
+
+# One compiled pattern per group, so each group is a single scan of the name
+CATEGORY_PATTERNS = tuple(
+    (category, re.compile("|".join(map(re.escape, keywords))))
+    for category, keywords in CATEGORY_KEYWORDS
+)
+
+
+@lru_cache(maxsize=4096)
+def detect_category_from_name(name: str) -> str:
+    """Detect category from transaction name when Plaid categories are not available."""
+    lower_name = name.lower()
+    for category, pattern in CATEGORY_PATTERNS:
+        if pattern.search(lower_name):
+            return category
+    return "Other"
+
 
 @router.get("/", response_model=List[TransactionResponse])
 async def get_transactions(
@@ -67,44 +97,6 @@ async def get_dashboard_data(
     logger = logging.getLogger(__name__)
     logger.info(f"Dashboard request for user_id: {current_user.id}")
     
-    def detect_category_from_name(name: str) -> str:
-        """Detect category from transaction name when Plaid categories are not available."""
-        lower_name = name.lower()
-        
-        # Food & Dining
-        if any(word in lower_name for word in ['mcdonald', 'starbucks', 'restaurant', 'cafe', 'pizza', 'burger', 'food', 'dining', 'grubhub', 'doordash', 'uber eats', 'postmates']):
-            return "Food & Dining"
-        
-        # Transportation
-        if any(word in lower_name for word in ['uber', 'lyft', 'taxi', 'gas', 'shell', 'exxon', 'chevron', 'bp', 'parking', 'toll', 'metro', 'bus', 'train', 'airline']):
-            return "Transportation"
-        
-        # Shopping
-        if any(word in lower_name for word in ['amazon', 'walmart', 'target', 'costco', 'best buy', 'home depot', 'lowes', 'macy', 'nordstrom', 'shop']):
-            return "Shopping"
-        
-        # Entertainment
-        if any(word in lower_name for word in ['netflix', 'spotify', 'hulu', 'disney', 'movie', 'theater', 'concert', 'game', 'steam', 'playstation']):
-            return "Entertainment"
-        
-        # Health & Fitness
-        if any(word in lower_name for word in ['gym', 'fitness', 'pharmacy', 'cvs', 'walgreens', 'doctor', 'medical', 'dental', 'vision', 'health']):
-            return "Health & Fitness"
-        
-        # Utilities & Bills
-        if any(word in lower_name for word in ['electric', 'gas bill', 'water', 'internet', 'phone', 'cable', 'at&t', 'verizon', 'comcast', 'spectrum']):
-            return "Utilities & Bills"
-        
-        # Banking & Finance
-        if any(word in lower_name for word in ['bank', 'atm', 'credit card', 'loan', 'mortgage', 'insurance']):
-            return "Banking & Finance"
-        
-        # Income
-        if any(word in lower_name for word in ['deposit', 'salary', 'payroll', 'refund', 'transfer in']):
-            return "Income"
-        
-        return "Other"
-    
     # Get all user accounts
     account_result = await db.execute(
         select(Account).where(Account.user_id == current_user.id)
@@ -164,8 +156,15 @@ async def get_dashboard_data(
     
     # Calculate monthly stats (simplified - last 30 days)
     thirty_days_ago = datetime.now().date() - timedelta(days=30)
+    # Only the columns the stats need, returned as lightweight rows
     monthly_transactions = await db.execute(
-        select(Transaction)
+        select(
+            Transaction.name,
+            Transaction.amount,
+            Transaction.transaction_type,
+            Transaction.category,
+            Transaction.custom_category
+        )
         .where(
             and_(
                 Transaction.user_id == current_user.id,
@@ -173,7 +172,7 @@ async def get_dashboard_data(
             )
         )
     )
-    monthly_txns = monthly_transactions.scalars().all()
+    monthly_txns = monthly_transactions.all()
     
     monthly_income = sum(txn.amount for txn in monthly_txns if txn.amount > 0)
     monthly_expenses = abs(sum(txn.amount for txn in monthly_txns if txn.amount < 0))
@@ -17,9 +17,7 @@ async def get_current_user_profile(
     current_user: User = Depends(get_current_active_user)
 ):
     """Get current user profile."""
-    user_response = UserResponse.from_orm(current_user)
-    user_response.has_plaid_connection = bool(current_user.plaid_access_token)
-    return user_response
+    return UserResponse.from_orm_fast(current_user)
 
 
 @router.put("/me", response_model=UserResponse)
@@ -35,6 +33,4 @@ async def update_current_user_profile(
     await db.commit()
     await db.refresh(current_user)
     
-    user_response = UserResponse.from_orm(current_user)
-    user_response.has_plaid_connection = bool(current_user.plaid_access_token)
-    return user_response 
\ No newline at end of file
+    return UserResponse.from_orm_fast(current_user) 
\ No newline at end of file
@@ -2,6 +2,7 @@
 Database session configuration for SQLAlchemy with async support.
 """
 
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
@@ -24,6 +25,12 @@ AsyncSessionLocal = sessionmaker(
 # Base class for all database models
 Base = declarative_base()
 
+# Columns added to existing tables after their first release. create_all only
+# creates missing tables, so these are applied idempotently on startup.
+SCHEMA_UPGRADES = (
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS plaid_transactions_cursor TEXT",
+)
+
 
 async def get_db() -> AsyncSession:
     """
@@ -45,4 +52,6 @@ async def init_db():
     async with engine.begin() as conn:
         # Import all models to ensure they are registered with SQLAlchemy
         from app.models import user, transaction, account  # noqa
-        await conn.run_sync(Base.metadata.create_all) 
\ No newline at end of file
+        await conn.run_sync(Base.metadata.create_all)
+        for statement in SCHEMA_UPGRADES:
+            await conn.execute(text(statement))
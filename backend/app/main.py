@@ -4,12 +4,13 @@ Main FastAPI application for the Finance Tracker.
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.exceptions import HTTPException
 import time
 import logging
 from app.core.config import settings
 from app.db.session import init_db
+from app.services.plaid import plaid_service
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -22,6 +23,7 @@ app = FastAPI(
     description="A modern finance tracker with AI-powered insights and Plaid integration",
     docs_url="/docs" if settings.debug else None,
     redoc_url="/redoc" if settings.debug else None,
+    default_response_class=ORJSONResponse,
 )
 
 # Add CORS middleware
@@ -47,7 +49,7 @@ async def add_process_time_header(request: Request, call_next):
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
     """Custom HTTP exception handler."""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={
             "error": True,
@@ -61,7 +63,7 @@ async def http_exception_handler(request: Request, exc: HTTPException):
 async def general_exception_handler(request: Request, exc: Exception):
     """General exception handler for unhandled errors."""
     logger.error(f"Unhandled exception: {exc}")
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "error": True,
@@ -89,6 +91,7 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on application shutdown."""
     logger.info("Shutting down Finance Tracker API...")
+    await plaid_service.aclose()
 
 
 @app.get("/")
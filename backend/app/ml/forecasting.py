@@ -3,11 +3,12 @@ AI-powered spending forecasting service.
 """
 
 import logging
+from collections import OrderedDict, defaultdict
 from datetime import datetime, date, timedelta
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, NamedTuple
 from decimal import Decimal
 import numpy as np
-from sqlalchemy import select, func, and_
+from sqlalchemy import Date, select, func, and_, cast
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.transaction import Transaction
 from app.models.user import User
@@ -15,6 +16,19 @@ from app.schemas.transaction import ForecastData
 
 logger = logging.getLogger(__name__)
 
+# Per-process LRU forecast cache: (user_id, days_ahead) -> (data version, forecasts).
+# An entry is reused only while the user's transactions are unchanged.
+FORECAST_CACHE_SIZE = 256
+_forecast_cache: OrderedDict[Tuple[Any, int], Tuple[Tuple, List[ForecastData]]] = OrderedDict()
+
+
+class MonthlySpending(NamedTuple):
+    """Expense totals for one category in one month."""
+    month: date
+    category: str
+    amount: float  # Sum of absolute amounts
+    transaction_count: int
+
 
 class SpendingForecastService:
     """Service for generating spending forecasts using ML techniques."""
@@ -26,68 +40,118 @@ class SpendingForecastService:
     async def generate_forecast(self, days_ahead: int = 30) -> List[ForecastData]:
         """Generate spending forecast for the specified number of days ahead."""
         try:
-            # Get historical transaction data
-            transactions = await self._get_historical_transactions()
-            if not transactions:
+            # Reuse the last forecast if the underlying data hasn't changed
+            cache_key = (self.user.id, days_ahead)
+            version = await self._get_data_version()
+            cached = _forecast_cache.get(cache_key)
+            if cached and cached[0] == version:
+                _forecast_cache.move_to_end(cache_key)
+                return cached[1]
+            
+            # Get historical spending, aggregated by month and category
+            monthly_spending = await self._get_monthly_spending()
+            if not monthly_spending:
                 return self._get_default_forecast(days_ahead)
             
             # Generate forecasts for different categories
             forecasts = []
             
-            # Get unique categories
-            categories = await self._get_transaction_categories(transactions)
+            # Index spending by category and month
+            category_monthly, category_counts = self._aggregate_by_category(monthly_spending)
+            
+            # Get top categories
+            categories = await self._get_transaction_categories(category_monthly)
             
             for category in categories:
                 category_forecast = await self._forecast_category(
-                    transactions, category, days_ahead
+                    category, category_monthly[category], category_counts[category], days_ahead
                 )
                 if category_forecast:
                     forecasts.append(category_forecast)
             
             # Add overall spending forecast
             overall_forecast = await self._forecast_overall_spending(
-                transactions, days_ahead
+                monthly_spending, days_ahead
             )
             if overall_forecast:
                 forecasts.append(overall_forecast)
             
+            _forecast_cache[cache_key] = (version, forecasts)
+            _forecast_cache.move_to_end(cache_key)
+            if len(_forecast_cache) > FORECAST_CACHE_SIZE:
+                _forecast_cache.popitem(last=False)
             return forecasts
             
         except Exception as e:
             logger.error(f"Error generating forecast: {e}")
             return self._get_default_forecast(days_ahead)
     
-    async def _get_historical_transactions(self) -> List[Transaction]:
-        """Get historical transactions for forecasting."""
+    async def _get_data_version(self) -> Tuple:
+        """
+        Identify the state of the user's transactions a forecast is built from.
+        
+        Inserts and deletes change the count, and every insert or update bumps
+        updated_at. The date is included since forecasts are relative to today.
+        """
+        result = await self.db.execute(
+            select(func.count(), func.max(Transaction.updated_at)).where(
+                Transaction.user_id == self.user.id
+            )
+        )
+        return (date.today(), *result.one())
+    
+    async def _get_monthly_spending(self) -> List[MonthlySpending]:
+        """
+        Get historical expenses totalled per month and category.
+        
+        The grouping is done by the database, so one row comes back per
+        month and category instead of one per transaction.
+        """
         # Get transactions from the last 6 months for better pattern recognition
         six_months_ago = datetime.utcnow() - timedelta(days=180)
         
-        query = select(Transaction).where(
+        # Same fallback as the per-transaction category display: custom
+        # category, then the first Plaid category (arrays are 1-based in SQL)
+        month = cast(func.date_trunc("month", Transaction.date), Date)
+        category = func.coalesce(
+            func.nullif(Transaction.custom_category, ""),
+            Transaction.category[1],
+            "Other"
+        )
+        query = select(
+            month,
+            category,
+            func.sum(func.abs(Transaction.amount_f)),
+            func.count()
+        ).where(
             and_(
                 Transaction.user_id == self.user.id,
+                Transaction.transaction_type == "debit",
                 Transaction.date >= six_months_ago
             )
-        ).order_by(Transaction.date.asc())
+        ).group_by(month, category)
         
         result = await self.db.execute(query)
-        return result.scalars().all()
+        return [MonthlySpending(*row) for row in result]
+    
+    def _aggregate_by_category(
+        self, monthly_spending: List[MonthlySpending]
+    ) -> Tuple[Dict[str, Dict[date, float]], Dict[str, int]]:
+        """Index monthly totals by category, and count transactions per category."""
+        category_monthly = defaultdict(dict)
+        category_counts = defaultdict(int)
+        for month, category, amount, transaction_count in monthly_spending:
+            category_monthly[category][month] = amount
+            category_counts[category] += transaction_count
+        return category_monthly, category_counts
     
-    async def _get_transaction_categories(self, transactions: List[Transaction]) -> List[str]:
+    async def _get_transaction_categories(self, category_monthly: Dict[str, Dict[date, float]]) -> List[str]:
         """Get unique transaction categories."""
-        categories = set()
-        for txn in transactions:
-            if txn.transaction_type == "debit":  # Only forecast expenses
-                category = txn.custom_category or (txn.category[0] if txn.category else "Other")
-                categories.add(category)
-        
         # Return top categories by spending volume
-        category_totals = {}
-        for txn in transactions:
-            if txn.transaction_type == "debit":
-                category = txn.custom_category or (txn.category[0] if txn.category else "Other")
-                if category not in category_totals:
-                    category_totals[category] = 0
-                category_totals[category] += abs(float(txn.amount))
+        category_totals = {
+            category: sum(monthly_data.values())
+            for category, monthly_data in category_monthly.items()
+        }
         
         # Sort by total spending and return top 5 categories
         sorted_categories = sorted(category_totals.items(), key=lambda x: x[1], reverse=True)
@@ -95,30 +159,16 @@ class SpendingForecastService:
     
     async def _forecast_category(
         self, 
-        transactions: List[Transaction], 
         category: str, 
+        monthly_data: Dict[date, float],
+        transaction_count: int,
         days_ahead: int
     ) -> Optional[ForecastData]:
-        """Forecast spending for a specific category."""
+        """Forecast spending for a specific category from its monthly totals."""
         try:
-            # Filter transactions for this category
-            category_transactions = [
-                txn for txn in transactions
-                if txn.transaction_type == "debit" and
-                (txn.custom_category or (txn.category[0] if txn.category else "Other")) == category
-            ]
-            
-            if len(category_transactions) < 5:
+            if transaction_count < 5:
                 return None
             
-            # Group by month for trend analysis
-            monthly_data = {}
-            for txn in category_transactions:
-                month_key = txn.date.replace(day=1)
-                if month_key not in monthly_data:
-                    monthly_data[month_key] = 0
-                monthly_data[month_key] += abs(float(txn.amount))
-            
             if len(monthly_data) < 2:
                 return None
             
@@ -170,19 +220,15 @@ class SpendingForecastService:
     
     async def _forecast_overall_spending(
         self, 
-        transactions: List[Transaction], 
+        monthly_spending: List[MonthlySpending], 
         days_ahead: int
     ) -> Optional[ForecastData]:
         """Forecast overall spending across all categories."""
         try:
             # Group expenses by month
-            monthly_expenses = {}
-            for txn in transactions:
-                if txn.transaction_type == "debit":
-                    month_key = txn.date.replace(day=1)
-                    if month_key not in monthly_expenses:
-                        monthly_expenses[month_key] = 0
-                    monthly_expenses[month_key] += abs(float(txn.amount))
+            monthly_expenses = defaultdict(float)
+            for month, _, amount, _ in monthly_spending:
+                monthly_expenses[month] += amount
             
             if len(monthly_expenses) < 2:
                 return None
@@ -3,6 +3,7 @@ Financial health scoring and analysis service.
 """
 
 import logging
+from collections import Counter, defaultdict
 from datetime import datetime, date, timedelta
 from typing import Dict, Any, List, Tuple
 from decimal import Decimal
@@ -97,13 +98,10 @@ class FinancialHealthService:
     
     async def _calculate_income_expense_ratio(self, transactions: List[Transaction]) -> Dict[str, Any]:
         """Calculate income to expense ratio."""
-        monthly_data = {}
+        monthly_data = defaultdict(lambda: {"income": 0.0, "expenses": 0.0})
         
         for txn in transactions:
-            month_key = txn.date.replace(day=1)
-            if month_key not in monthly_data:
-                monthly_data[month_key] = {"income": 0, "expenses": 0}
-            
+            month_key = txn.date.year * 12 + txn.date.month  # Integer month index
             if txn.transaction_type == "credit":
                 monthly_data[month_key]["income"] += abs(float(txn.amount))
             else:
@@ -148,13 +146,10 @@ class FinancialHealthService:
     
     async def _calculate_savings_rate(self, transactions: List[Transaction]) -> Dict[str, Any]:
         """Calculate savings rate."""
-        monthly_data = {}
+        monthly_data = defaultdict(lambda: {"income": 0.0, "expenses": 0.0})
         
         for txn in transactions:
-            month_key = txn.date.replace(day=1)
-            if month_key not in monthly_data:
-                monthly_data[month_key] = {"income": 0, "expenses": 0}
-            
+            month_key = txn.date.year * 12 + txn.date.month  # Integer month index
             if txn.transaction_type == "credit":
                 monthly_data[month_key]["income"] += abs(float(txn.amount))
             else:
@@ -199,13 +194,10 @@ class FinancialHealthService:
     async def _calculate_spending_consistency(self, transactions: List[Transaction]) -> Dict[str, Any]:
         """Calculate spending consistency score."""
         # Group expenses by month
-        monthly_expenses = {}
+        monthly_expenses = defaultdict(float)
         for txn in transactions:
             if txn.transaction_type == "debit":
-                month_key = txn.date.replace(day=1)
-                if month_key not in monthly_expenses:
-                    monthly_expenses[month_key] = 0
-                monthly_expenses[month_key] += abs(float(txn.amount))
+                monthly_expenses[txn.date.year * 12 + txn.date.month] += abs(float(txn.amount))
         
         if len(monthly_expenses) < 3:
             return {"score": 50, "consistency": 0, "status": "insufficient_data"}
@@ -294,14 +286,11 @@ class FinancialHealthService:
     
     async def _calculate_category_diversity(self, transactions: List[Transaction]) -> Dict[str, Any]:
         """Calculate spending category diversity score."""
-        category_counts = {}
-        
-        for txn in transactions:
-            if txn.transaction_type == "debit":
-                category = txn.custom_category or (txn.category[0] if txn.category else "Other")
-                if category not in category_counts:
-                    category_counts[category] = 0
-                category_counts[category] += 1
+        category_counts = Counter(
+            txn.custom_category or (txn.category[0] if txn.category else "Other")
+            for txn in transactions
+            if txn.transaction_type == "debit"
+        )
         
         if not category_counts:
             return {"score": 0, "diversity": 0, "status": "no_expenses"}
@@ -350,13 +339,10 @@ class FinancialHealthService:
     
     async def _get_monthly_expenses(self, transactions: List[Transaction]) -> float:
         """Get average monthly expenses."""
-        monthly_expenses = {}
+        monthly_expenses = defaultdict(float)
         for txn in transactions:
             if txn.transaction_type == "debit":
-                month_key = txn.date.replace(day=1)
-                if month_key not in monthly_expenses:
-                    monthly_expenses[month_key] = 0
-                monthly_expenses[month_key] += abs(float(txn.amount))
+                monthly_expenses[txn.date.year * 12 + txn.date.month] += abs(float(txn.amount))
         
         if not monthly_expenses:
             return 0
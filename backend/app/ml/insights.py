@@ -3,10 +3,12 @@ AI-powered spending insights and analysis service.
 """
 
 import logging
+from collections import defaultdict
 from datetime import datetime, date, timedelta
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, NamedTuple
 from decimal import Decimal
 import numpy as np
+from numba import njit
 from sqlalchemy import select, func, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.transaction import Transaction
@@ -15,6 +17,76 @@ from app.schemas.transaction import SpendingInsight
 
 logger = logging.getLogger(__name__)
 
+# Above this many transactions the JIT-compiled anomaly kernel is used
+JIT_ANOMALY_THRESHOLD = 5000
+
+
+class TransactionFeatures(NamedTuple):
+    """Compact per-transaction features consumed by the insight analyzers."""
+    date: date
+    amount: float  # Absolute amount
+    transaction_type: str
+    category: str
+
+
+def _zscore_anomalies(
+    day_codes: np.ndarray, amounts: np.ndarray, threshold: float = 2.0
+) -> Tuple[np.ndarray, np.ndarray, float]:
+    """
+    Find days whose total spending is more than `threshold` standard deviations
+    from the mean daily spending, considering only days with spending.
+    
+    Args:
+        day_codes: Non-negative day index for each expense
+        amounts: Absolute amount for each expense
+        threshold: Z-score above which a day is flagged
+    
+    Returns:
+        Flagged day codes, their totals, and the mean daily spending
+    """
+    totals = np.bincount(day_codes, weights=amounts)
+    totals = totals[np.bincount(day_codes) > 0]
+    days = np.unique(day_codes)
+    mean_amount = totals.mean()
+    std_amount = totals.std()
+    if std_amount == 0:
+        return days[:0], totals[:0], mean_amount
+    mask = np.abs((totals - mean_amount) / std_amount) > threshold
+    return days[mask], totals[mask], mean_amount
+
+
+@njit(cache=True, fastmath=True)
+def _zscore_anomalies_jit(day_codes, amounts, threshold=2.0):
+    """JIT-compiled equivalent of _zscore_anomalies for large histories."""
+    n_days = day_codes.max() + 1
+    totals = np.zeros(n_days)
+    seen = np.zeros(n_days, dtype=np.bool_)
+    for i in range(len(amounts)):
+        totals[day_codes[i]] += amounts[i]
+        seen[day_codes[i]] = True
+    
+    count = 0
+    total = 0.0
+    for d in range(n_days):
+        if seen[d]:
+            count += 1
+            total += totals[d]
+    mean_amount = total / count
+    
+    variance = 0.0
+    for d in range(n_days):
+        if seen[d]:
+            variance += (totals[d] - mean_amount) ** 2
+    std_amount = np.sqrt(variance / count)
+    
+    flagged = np.zeros(n_days, dtype=np.bool_)
+    if std_amount > 0:
+        for d in range(n_days):
+            if seen[d] and abs((totals[d] - mean_amount) / std_amount) > threshold:
+                flagged[d] = True
+    days = np.nonzero(flagged)[0]
+    return days, totals[days], mean_amount
+
 
 class SpendingInsightsService:
     """Service for generating AI-powered spending insights."""
@@ -25,20 +97,22 @@ class SpendingInsightsService:
     
     async def generate_insights(self) -> List[SpendingInsight]:
         """Generate comprehensive spending insights for the user."""
+        # Single timestamp shared by every insight generated in this call
+        now = datetime.utcnow()
         try:
             insights = []
             
-            # Get transaction data for analysis
-            transactions = await self._get_user_transactions()
+            # Build the feature frame for analysis
+            transactions = await self._build_feature_frame()
             if not transactions:
-                return self._get_default_insights()
+                return self._get_default_insights(now)
             
             # Generate different types of insights
-            insights.extend(await self._analyze_spending_trends(transactions))
-            insights.extend(await self._detect_spending_anomalies(transactions))
-            insights.extend(await self._generate_savings_recommendations(transactions))
-            insights.extend(await self._analyze_category_patterns(transactions))
-            insights.extend(await self._detect_budget_issues(transactions))
+            await self._analyze_spending_trends(transactions, now, insights)
+            await self._detect_spending_anomalies(transactions, now, insights)
+            await self._generate_savings_recommendations(transactions, now, insights)
+            await self._analyze_category_patterns(transactions, now, insights)
+            await self._detect_budget_issues(transactions, now, insights)
             
             # Sort by confidence score and return top insights
             insights.sort(key=lambda x: x.confidence_score, reverse=True)
@@ -46,38 +120,53 @@ class SpendingInsightsService:
             
         except Exception as e:
             logger.error(f"Error generating insights: {e}")
-            return self._get_default_insights()
+            return self._get_default_insights(now)
     
-    async def _get_user_transactions(self) -> List[Transaction]:
-        """Get user's transactions for analysis."""
-        query = select(Transaction).where(
+    async def _build_feature_frame(self) -> List[TransactionFeatures]:
+        """
+        Stream the user's transactions and reduce each row to its features.
+        
+        Only the columns the analyzers need are selected, so rows come back as
+        plain tuples without ORM hydration, fetched from a server-side cursor
+        in batches instead of materializing the full history at once.
+        """
+        query = select(
+            Transaction.date,
+            Transaction.amount_f,
+            Transaction.transaction_type,
+            Transaction.category,
+            Transaction.custom_category
+        ).where(
             Transaction.user_id == self.user.id
-        ).order_by(Transaction.date.desc())
+        ).order_by(Transaction.date.desc()).execution_options(yield_per=1000)
         
-        result = await self.db.execute(query)
-        return result.scalars().all()
+        features = []
+        stream = await self.db.stream(query)
+        async for txn_date, amount, transaction_type, category, custom_category in stream:
+            features.append(TransactionFeatures(
+                txn_date,
+                abs(amount),
+                transaction_type,
+                custom_category or (category[0] if category else "Other")
+            ))
+        return features
     
-    async def _analyze_spending_trends(self, transactions: List[Transaction]) -> List[SpendingInsight]:
+    async def _analyze_spending_trends(self, transactions: List[TransactionFeatures], now: datetime, out: List[SpendingInsight]) -> None:
         """Analyze spending trends over time."""
-        insights = []
-        
         if len(transactions) < 10:
-            return insights
+            return
         
         # Group transactions by month
-        monthly_data = {}
-        for txn in transactions:
-            month_key = txn.date.replace(day=1)
-            if month_key not in monthly_data:
-                monthly_data[month_key] = {"income": 0, "expenses": 0}
-            
-            if txn.transaction_type == "credit":
-                monthly_data[month_key]["income"] += abs(float(txn.amount))
+        monthly_data = defaultdict(lambda: {"income": 0.0, "expenses": 0.0})
+        for txn_date, amount, transaction_type, _ in transactions:
+            month_key = txn_date.year * 12 + txn_date.month  # Integer month index
+            if transaction_type == "credit":
+                monthly_data[month_key]["income"] += amount
             else:
-                monthly_data[month_key]["expenses"] += abs(float(txn.amount))
+                monthly_data[month_key]["expenses"] += amount
         
         if len(monthly_data) < 2:
-            return insights
+            return
         
         # Calculate month-over-month changes
         months = sorted(monthly_data.keys())
@@ -91,78 +180,67 @@ class SpendingInsightsService:
             change_percentage = ((current_expenses - previous_expenses) / previous_expenses) * 100
             
             if change_percentage > 20:
-                insights.append(SpendingInsight(
+                out.append(SpendingInsight(
                     insight_type="trend",
                     title="Spending Increase Alert",
                     description=f"Your spending increased by {change_percentage:.1f}% this month compared to last month. Consider reviewing your budget.",
                     confidence_score=0.85,
-                    created_at=datetime.utcnow()
+                    created_at=now
                 ))
             elif change_percentage < -20:
-                insights.append(SpendingInsight(
+                out.append(SpendingInsight(
                     insight_type="trend",
                     title="Great Spending Control",
                     description=f"Your spending decreased by {abs(change_percentage):.1f}% this month! Keep up the good work.",
                     confidence_score=0.80,
-                    created_at=datetime.utcnow()
+                    created_at=now
                 ))
-        
-        return insights
     
-    async def _detect_spending_anomalies(self, transactions: List[Transaction]) -> List[SpendingInsight]:
+    async def _detect_spending_anomalies(self, transactions: List[TransactionFeatures], now: datetime, out: List[SpendingInsight]) -> None:
         """Detect unusual spending patterns."""
-        insights = []
-        
         if len(transactions) < 20:
-            return insights
-        
-        # Calculate average daily spending
-        daily_spending = {}
-        for txn in transactions:
-            if txn.transaction_type == "debit":  # Only expenses
-                day_key = txn.date
-                if day_key not in daily_spending:
-                    daily_spending[day_key] = 0
-                daily_spending[day_key] += abs(float(txn.amount))
-        
-        if not daily_spending:
-            return insights
+            return
         
-        # Calculate statistics
-        amounts = list(daily_spending.values())
-        mean_amount = np.mean(amounts)
-        std_amount = np.std(amounts)
+        # Encode expense dates as day offsets from the earliest expense
+        expenses = [
+            (txn_date.toordinal(), amount)
+            for txn_date, amount, transaction_type, _ in transactions
+            if transaction_type == "debit"
+        ]
+        if not expenses:
+            return
+        ordinals = np.fromiter((ordinal for ordinal, _ in expenses), dtype=np.int64, count=len(expenses))
+        amounts = np.fromiter((amount for _, amount in expenses), dtype=np.float64, count=len(expenses))
+        first_ordinal = int(ordinals.min())
+        day_codes = ordinals - first_ordinal
         
-        if std_amount > 0:
-            # Find days with spending > 2 standard deviations from mean
-            for day, amount in daily_spending.items():
-                z_score = abs((amount - mean_amount) / std_amount)
-                if z_score > 2:
-                    insights.append(SpendingInsight(
-                        insight_type="anomaly",
-                        title="Unusual Spending Day",
-                        description=f"On {day.strftime('%B %d')}, you spent ${amount:.2f}, which is significantly higher than your average daily spending of ${mean_amount:.2f}.",
-                        confidence_score=0.90,
-                        created_at=datetime.utcnow()
-                    ))
+        # Find days with spending > 2 standard deviations from mean
+        if len(transactions) > JIT_ANOMALY_THRESHOLD:
+            days, totals, mean_amount = _zscore_anomalies_jit(day_codes, amounts, 2.0)
+        else:
+            days, totals, mean_amount = _zscore_anomalies(day_codes, amounts, 2.0)
         
-        return insights
+        # Most recent days first
+        for day_code, amount in zip(days[::-1].tolist(), totals[::-1].tolist()):
+            day = date.fromordinal(first_ordinal + day_code)
+            out.append(SpendingInsight(
+                insight_type="anomaly",
+                title="Unusual Spending Day",
+                description=f"On {day.strftime('%B %d')}, you spent ${amount:.2f}, which is significantly higher than your average daily spending of ${mean_amount:.2f}.",
+                confidence_score=0.90,
+                created_at=now
+            ))
     
-    async def _generate_savings_recommendations(self, transactions: List[Transaction]) -> List[SpendingInsight]:
+    async def _generate_savings_recommendations(self, transactions: List[TransactionFeatures], now: datetime, out: List[SpendingInsight]) -> None:
         """Generate savings recommendations based on spending patterns."""
-        insights = []
-        
         # Analyze category spending for savings opportunities
-        category_spending = {}
-        for txn in transactions:
-            if txn.transaction_type == "debit":  # Only expenses
-                category = txn.custom_category or (txn.category[0] if txn.category else "Other")
-                if category not in category_spending:
-                    category_spending[category] = 0
-                category_spending[category] += abs(float(txn.amount))
+        category_spending = defaultdict(float)
+        for _, amount, transaction_type, category in transactions:
+            if transaction_type == "debit":  # Only expenses
+                category_spending[category] += amount
         
         if not category_spending:
-            return insights
+            return
         
         # Find highest spending categories
         sorted_categories = sorted(category_spending.items(), key=lambda x: x[1], reverse=True)
@@ -171,34 +249,23 @@ class SpendingInsightsService:
         for category, amount in sorted_categories[:3]:
             if amount > 100:  # Only suggest for significant spending
                 potential_savings = amount * 0.2  # Suggest 20% reduction
-                insights.append(SpendingInsight(
+                out.append(SpendingInsight(
                     insight_type="recommendation",
                     title=f"Save on {category.title()}",
                     description=f"You spent ${amount:.2f} on {category.lower()} this month. Consider reducing this by 20% to save ${potential_savings:.2f} monthly.",
                     category=category,
                     confidence_score=0.75,
-                    created_at=datetime.utcnow()
+                    created_at=now
                 ))
-        
-        return insights
     
-    async def _analyze_category_patterns(self, transactions: List[Transaction]) -> List[SpendingInsight]:
+    async def _analyze_category_patterns(self, transactions: List[TransactionFeatures], now: datetime, out: List[SpendingInsight]) -> None:
         """Analyze spending patterns by category."""
-        insights = []
-        
         # Group transactions by category and day of week
-        category_day_patterns = {}
-        for txn in transactions:
-            if txn.transaction_type == "debit":  # Only expenses
-                category = txn.custom_category or (txn.category[0] if txn.category else "Other")
-                day_of_week = txn.date.strftime("%A")
-                
-                if category not in category_day_patterns:
-                    category_day_patterns[category] = {}
-                if day_of_week not in category_day_patterns[category]:
-                    category_day_patterns[category][day_of_week] = 0
-                
-                category_day_patterns[category][day_of_week] += abs(float(txn.amount))
+        category_day_patterns = defaultdict(lambda: defaultdict(float))
+        for txn_date, amount, transaction_type, category in transactions:
+            if transaction_type == "debit":  # Only expenses
+                day_of_week = txn_date.strftime("%A")
+                category_day_patterns[category][day_of_week] += amount
         
         # Find patterns
         for category, day_data in category_day_patterns.items():
@@ -207,59 +274,53 @@ class SpendingInsightsService:
                 min_day = min(day_data.items(), key=lambda x: x[1])
                 
                 if max_day[1] > min_day[1] * 2:  # Significant difference
-                    insights.append(SpendingInsight(
+                    out.append(SpendingInsight(
                         insight_type="pattern",
                         title=f"{category.title()} Spending Pattern",
                         description=f"You tend to spend more on {category.lower()} on {max_day[0]}s (${max_day[1]:.2f}) compared to {min_day[0]}s (${min_day[1]:.2f}).",
                         category=category,
                         confidence_score=0.70,
-                        created_at=datetime.utcnow()
+                        created_at=now
                     ))
-        
-        return insights
     
-    async def _detect_budget_issues(self, transactions: List[Transaction]) -> List[SpendingInsight]:
+    async def _detect_budget_issues(self, transactions: List[TransactionFeatures], now: datetime, out: List[SpendingInsight]) -> None:
         """Detect potential budget issues."""
-        insights = []
-        
         # This would integrate with actual budget data
         # For now, provide general financial health insights
         
         # Calculate monthly income vs expenses
-        current_month = datetime.utcnow().replace(day=1)
+        current_month = now.date().replace(day=1)
         monthly_income = 0
         monthly_expenses = 0
         
-        for txn in transactions:
-            if txn.date >= current_month:
-                if txn.transaction_type == "credit":
-                    monthly_income += abs(float(txn.amount))
+        for txn_date, amount, transaction_type, _ in transactions:
+            if txn_date >= current_month:
+                if transaction_type == "credit":
+                    monthly_income += amount
                 else:
-                    monthly_expenses += abs(float(txn.amount))
+                    monthly_expenses += amount
         
         if monthly_income > 0:
             expense_ratio = monthly_expenses / monthly_income
             
             if expense_ratio > 0.9:
-                insights.append(SpendingInsight(
+                out.append(SpendingInsight(
                     insight_type="alert",
                     title="High Expense Ratio",
                     description=f"Your expenses are {expense_ratio:.1%} of your income this month. Consider reducing spending to improve savings.",
                     confidence_score=0.85,
-                    created_at=datetime.utcnow()
+                    created_at=now
                 ))
             elif expense_ratio < 0.5:
-                insights.append(SpendingInsight(
+                out.append(SpendingInsight(
                     insight_type="positive",
                     title="Excellent Savings Rate",
                     description=f"Great job! You're only spending {expense_ratio:.1%} of your income, leaving plenty for savings and investments.",
                     confidence_score=0.80,
-                    created_at=datetime.utcnow()
+                    created_at=now
                 ))
-        
-        return insights
     
-    def _get_default_insights(self) -> List[SpendingInsight]:
+    def _get_default_insights(self, now: datetime) -> List[SpendingInsight]:
         """Return default insights when no transaction data is available."""
         return [
             SpendingInsight(
@@ -267,6 +328,6 @@ class SpendingInsightsService:
                 title="Welcome to Finance Tracker!",
                 description="Start connecting your bank accounts and adding transactions to receive personalized AI insights.",
                 confidence_score=1.0,
-                created_at=datetime.utcnow()
+                created_at=now
             )
         ]
@@ -5,9 +5,11 @@ Transaction model for financial transactions from Plaid API.
 import uuid
 from datetime import datetime, date
 from decimal import Decimal
-from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Numeric, Text, Date, Integer
+from functools import cached_property
+from typing import NamedTuple
+from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Numeric, Text, Date, Integer, Float, Index, cast, event, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB, ARRAY
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, column_property
 from app.db.session import Base
 
 
@@ -15,6 +17,16 @@ class Transaction(Base):
     """Financial transaction model for Plaid transactions."""
     
     __tablename__ = "transactions"
+    __table_args__ = (
+        # Composite indexes matching the per-user insights and listing queries
+        Index("ix_tx_user_date", "user_id", "date"),
+        Index(
+            "ix_tx_user_date_debit", "user_id", "date",
+            postgresql_where=text("transaction_type = 'debit'")
+        ),
+        Index("ix_tx_user_type_date", "user_id", "transaction_type", "date"),
+        Index("ix_tx_user_category_date", "user_id", "custom_category", "date"),
+    )
     
     # Primary key
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
@@ -29,6 +41,8 @@ class Transaction(Base):
     
     # Transaction details
     amount = Column(Numeric(15, 2), nullable=False)  # Always positive
+    # Amount cast to double precision by the database, for numeric analysis
+    amount_f = column_property(cast(amount, Float), deferred=True)
     iso_currency_code = Column(String(3), default="USD")
     name = Column(String(500), nullable=False)  # Merchant/description
     merchant_name = Column(String(255), nullable=True)
@@ -102,6 +116,14 @@ class Transaction(Base):
         return self.transaction_type == "credit"
 
 
+class BudgetMetrics(NamedTuple):
+    """Derived budget figures computed together in a single pass."""
+    remaining_amount: Decimal
+    utilization_percentage: float
+    is_over_budget: bool
+    should_alert: bool
+
+
 class Budget(Base):
     """Budget model for user spending goals and limits."""
     
@@ -139,24 +161,47 @@ class Budget(Base):
     def __repr__(self):
         return f"<Budget(id={self.id}, name={self.name}, limit={self.budget_limit})>"
     
+    @cached_property
+    def _metrics(self) -> BudgetMetrics:
+        """Compute all derived budget figures at once, memoized on the instance."""
+        # Money and the flags derived from it stay exact; only the displayed
+        # percentage is computed in float
+        limit = self.budget_limit
+        spent = self.spent_amount
+        utilization = min(100.0, float(spent) / float(limit) * 100) if limit > 0 else 0.0
+        return BudgetMetrics(
+            remaining_amount=max(Decimal(0), limit - spent),
+            utilization_percentage=utilization,
+            is_over_budget=spent > limit,
+            should_alert=limit > 0 and spent >= limit * self.alert_threshold
+        )
+    
     @property
     def remaining_amount(self):
         """Get remaining budget amount."""
-        return max(0, self.budget_limit - self.spent_amount)
+        return self._metrics.remaining_amount
     
     @property
     def utilization_percentage(self):
         """Get budget utilization as percentage."""
-        if self.budget_limit > 0:
-            return min(100, (self.spent_amount / self.budget_limit) * 100)
-        return 0
+        return self._metrics.utilization_percentage
     
     @property
     def is_over_budget(self):
         """Check if budget is exceeded."""
-        return self.spent_amount > self.budget_limit
+        return self._metrics.is_over_budget
     
     @property
     def should_alert(self):
         """Check if user should be alerted about budget usage."""
-        return self.utilization_percentage >= (self.alert_threshold * 100) 
\ No newline at end of file
+        return self._metrics.should_alert
+
+
+@event.listens_for(Budget.budget_limit, "set")
+@event.listens_for(Budget.spent_amount, "set")
+@event.listens_for(Budget.alert_threshold, "set")
+@event.listens_for(Budget, "refresh")
+@event.listens_for(Budget, "expire")
+def _reset_budget_metrics(target, *args):
+    """Drop memoized budget metrics whenever their inputs may have changed."""
+    target.__dict__.pop("_metrics", None)
@@ -32,6 +32,7 @@ class User(Base):
     # Plaid integration
     plaid_access_token = Column(Text, nullable=True)  # Encrypted Plaid access token
     plaid_item_id = Column(String(255), nullable=True)
+    plaid_transactions_cursor = Column(Text, nullable=True)  # Position in Plaid's /transactions/sync stream
     
     # Preferences
     preferred_currency = Column(String(3), default="USD")
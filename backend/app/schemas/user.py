@@ -2,11 +2,26 @@
 Pydantic schemas for user authentication and profile management.
 """
 
+import re
 from typing import Optional, List
 from datetime import datetime
-from pydantic import BaseModel, EmailStr, validator
+from pydantic import BaseModel, ConfigDict, EmailStr, field_validator
 from uuid import UUID
 
+# At least 8 characters including a digit. The uppercase rule is a separate
+# str.isupper scan, so that non-ASCII capitals count, which [A-Z] would reject.
+PASSWORD_PATTERN = re.compile(r"(?=.*\d).{8,}", re.DOTALL)
+
+
+def _check_password(v: str) -> str:
+    """Validate password requirements shared by registration and reset."""
+    if not PASSWORD_PATTERN.fullmatch(v) or not any(c.isupper() for c in v):
+        raise ValueError(
+            "Password must be at least 8 characters long and contain "
+            "at least one digit and one uppercase letter"
+        )
+    return v
+
 
 class UserBase(BaseModel):
     """Base user schema with common fields."""
@@ -22,16 +37,11 @@ class UserCreate(UserBase):
     """Schema for user registration."""
     password: str
     
-    @validator("password")
+    @field_validator("password")
+    @classmethod
     def validate_password(cls, v):
         """Validate password requirements."""
-        if len(v) < 8:
-            raise ValueError("Password must be at least 8 characters long")
-        if not any(c.isdigit() for c in v):
-            raise ValueError("Password must contain at least one digit")
-        if not any(c.isupper() for c in v):
-            raise ValueError("Password must contain at least one uppercase letter")
-        return v
+        return _check_password(v)
 
 
 class UserUpdate(BaseModel):
@@ -58,8 +68,25 @@ class UserResponse(UserBase):
     last_login: Optional[datetime] = None
     has_plaid_connection: bool = False
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+    
+    @classmethod
+    def from_orm_fast(cls, user) -> "UserResponse":
+        """Build a response from a trusted User row, skipping validation."""
+        return cls.model_construct(
+            id=user.id,
+            email=user.email,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            phone=user.phone,
+            preferred_currency=user.preferred_currency,
+            timezone=user.timezone,
+            is_active=user.is_active,
+            is_verified=user.is_verified,
+            created_at=user.created_at,
+            last_login=user.last_login,
+            has_plaid_connection=bool(user.plaid_access_token)
+        )
 
 
 class Token(BaseModel):
@@ -86,16 +113,11 @@ class PasswordResetConfirm(BaseModel):
     token: str
     new_password: str
     
-    @validator("new_password")
+    @field_validator("new_password")
+    @classmethod
     def validate_password(cls, v):
         """Validate password requirements."""
-        if len(v) < 8:
-            raise ValueError("Password must be at least 8 characters long")
-        if not any(c.isdigit() for c in v):
-            raise ValueError("Password must contain at least one digit")
-        if not any(c.isupper() for c in v):
-            raise ValueError("Password must contain at least one uppercase letter")
-        return v
+        return _check_password(v)
 
 
 class PlaidConnection(BaseModel):
@@ -103,4 +125,5 @@ class PlaidConnection(BaseModel):
     is_connected: bool
     institution_name: Optional[str] = None
     accounts_count: int = 0
-    last_sync: Optional[datetime] = None 
\ No newline at end of file
+    last_sync: Optional[datetime] = None
+    transactions_synced: bool = False  # Initial transaction sync after linking has completed
@@ -3,13 +3,16 @@ Plaid service for bank account integration and transaction syncing.
 Handles Plaid API interactions, account connections, and data synchronization.
 """
 
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
-from datetime import datetime, date, timedelta
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime, date
 from decimal import Decimal
+from uuid import UUID
+import httpx
+import orjson
 import plaid
 from plaid.api import plaid_api
-from plaid.model.transactions_get_request import TransactionsGetRequest
 from plaid.model.accounts_get_request import AccountsGetRequest
 from plaid.model.item_public_token_exchange_request import ItemPublicTokenExchangeRequest
 from plaid.model.link_token_create_request import LinkTokenCreateRequest
@@ -18,16 +21,84 @@ from plaid.model.country_code import CountryCode
 from plaid.model.products import Products
 from plaid.configuration import Configuration
 from plaid.api_client import ApiClient
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.core.config import settings
-from app.core.security import encrypt_plaid_token, decrypt_plaid_token
 from app.models.user import User
 from app.models.account import Account
 from app.models.transaction import Transaction
 
 logger = logging.getLogger(__name__)
 
+# Plaid environment and Link settings, resolved once from configuration
+PLAID_HOST = {
+    'sandbox': plaid.Environment.Sandbox,
+    'development': plaid.Environment.Development,
+}.get(settings.plaid_env, plaid.Environment.Production)
+PLAID_PRODUCTS = tuple(Products(prod) for prod in settings.plaid_products)
+PLAID_COUNTRY_CODES = tuple(CountryCode(code) for code in settings.plaid_country_codes)
+
+# Transient gateway errors retried by direct API calls, with exponential backoff
+PLAID_RETRY_STATUSES = frozenset({502, 503, 504})
+PLAID_MAX_RETRIES = 3
+PLAID_RETRY_BACKOFF = 0.2  # Seconds before the first retry, doubled after each
+
+# Transactions per Plaid page; 500 is the most the API allows
+PLAID_TRANSACTIONS_PAGE_SIZE = 500
+
+# Rows per multi-row upsert statement; keeps each statement well under
+# Postgres' 32767 bind parameter limit
+UPSERT_BATCH_SIZE = 1000
+
+# Columns refreshed from Plaid when an existing row is upserted; user-owned
+# fields (custom categories, notes, tags, ...) are never overwritten
+ACCOUNT_UPSERT_COLUMNS = (
+    'account_name', 'account_type', 'account_subtype', 'official_name',
+    'current_balance', 'available_balance', 'credit_limit', 'mask',
+    'currency_code', 'last_sync', 'plaid_metadata',
+)
+TRANSACTION_UPSERT_COLUMNS = (
+    'amount', 'iso_currency_code', 'name', 'merchant_name', 'date',
+    'authorized_date', 'category', 'category_id', 'transaction_type',
+    'pending', 'location', 'plaid_metadata',
+)
+
+
+def _to_decimal(value: Optional[float]) -> Optional[Decimal]:
+    """Convert a Plaid amount to a Decimal at the 2-place scale of our money columns."""
+    if value is None:
+        return None
+    return Decimal(format(value, '.2f'))
+
+
+def _parse_date(value: Any) -> Optional[date]:
+    """Parse a Plaid ISO date string, passing through values already parsed."""
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(value) if value else None
+
+
+def _build_account_metadata(plaid_account: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a Plaid account into the JSON-serializable dict stored as metadata."""
+    balances = plaid_account.get('balances') or {}
+    subtype = plaid_account.get('subtype')
+    return {
+        'account_id': plaid_account['account_id'],
+        'name': plaid_account['name'],
+        'type': str(plaid_account['type']),
+        'subtype': str(subtype) if subtype else None,
+        'official_name': plaid_account.get('official_name'),
+        'mask': plaid_account.get('mask'),
+        'balances': {
+            'current': balances.get('current'),
+            'available': balances.get('available'),
+            'limit': balances.get('limit'),
+            'iso_currency_code': balances.get('iso_currency_code')
+        }
+    }
+
 
 class PlaidService:
     """Service for handling Plaid API interactions."""
@@ -35,42 +106,121 @@ class PlaidService:
     def __init__(self):
         """Initialize Plaid client with configuration."""
         configuration = Configuration(
-            host=self._get_plaid_host(),
+            host=PLAID_HOST,
             api_key={
                 'clientId': settings.plaid_client_id,
                 'secret': settings.plaid_secret,
             }
         )
+        # SDK calls run in asyncio.to_thread workers, so size the SDK's
+        # connection pool for concurrent threads rather than urllib3's
+        # default. They are deliberately not retried: the public token
+        # exchange is not idempotent, so a retried request could fail
+        # after a lost success.
+        configuration.connection_pool_maxsize = 32
         api_client = ApiClient(configuration)
         self.client = plaid_api.PlaidApi(api_client)
         
-    def _get_plaid_host(self):
-        """Get Plaid host based on environment."""
-        if settings.plaid_env == "sandbox":
-            return plaid.Environment.Sandbox
-        elif settings.plaid_env == "development":
-            return plaid.Environment.Development
-        else:
-            return plaid.Environment.Production
+        # Pooled async HTTP client for the high-volume endpoints, which are
+        # called directly to skip the SDK's request/response model overhead.
+        # Idle connections are kept for up to 5 minutes rather than httpx's
+        # default 5 seconds, so syncs that follow each other closely reuse
+        # the same TLS connection instead of handshaking again.
+        self._http = httpx.AsyncClient(
+            base_url=PLAID_HOST,
+            http2=True,
+            timeout=30,
+            limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=300)
+        )
+    
+    async def aclose(self):
+        """Close pooled HTTP connections to Plaid."""
+        await self._http.aclose()
+        
+    def _upsert_columns(self, stmt, columns) -> Dict[str, Any]:
+        """Build the ON CONFLICT DO UPDATE assignments for an upsert statement."""
+        set_ = {column: stmt.excluded[column] for column in columns}
+        set_['updated_at'] = datetime.utcnow()
+        return set_
     
-    def _serialize_plaid_data(self, data):
-        """Convert Plaid API objects to JSON-serializable dictionaries."""
-        if hasattr(data, 'to_dict'):
-            return data.to_dict()
-        elif isinstance(data, dict):
-            # Recursively serialize dictionary values
-            serialized = {}
-            for key, value in data.items():
-                if hasattr(value, 'to_dict'):
-                    serialized[key] = value.to_dict()
-                elif hasattr(value, '__dict__'):
-                    # Convert object to dict if it has attributes
-                    serialized[key] = {k: v for k, v in value.__dict__.items() if not k.startswith('_')}
-                else:
-                    serialized[key] = value
-            return serialized
-        else:
-            return data
+    async def _upsert(
+        self,
+        db: AsyncSession,
+        model,
+        rows: List[Dict[str, Any]],
+        conflict_column,
+        columns,
+        returning=None
+    ) -> List[Any]:
+        """
+        Insert rows, updating existing ones on conflict, in multi-row batches.
+        
+        Args:
+            db: Database session
+            model: Mapped class to upsert into
+            rows: Column values for each row
+            conflict_column: Unique column identifying existing rows
+            columns: Columns refreshed on existing rows
+            returning: Column to return for each row instead of the full entity
+            
+        Returns:
+            The inserted or updated entities, or the returning column's values
+        """
+        upserted = []
+        for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+            stmt = pg_insert(model).values(rows[start:start + UPSERT_BATCH_SIZE])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[conflict_column],
+                set_=self._upsert_columns(stmt, columns)
+            )
+            if returning is None:
+                result = await db.scalars(
+                    stmt.returning(model),
+                    execution_options={"populate_existing": True}
+                )
+            else:
+                result = await db.scalars(stmt.returning(returning))
+            upserted.extend(result.all())
+        return upserted
+    
+    async def _post(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        POST a request directly to the Plaid HTTP API.
+        
+        Transient gateway errors are retried, so only idempotent endpoints
+        should be called through here.
+        
+        Args:
+            path: API endpoint path, e.g. /transactions/sync
+            payload: Request body without credentials
+            
+        Returns:
+            Decoded JSON response
+        """
+        body = {
+            'client_id': settings.plaid_client_id,
+            'secret': settings.plaid_secret,
+            **payload
+        }
+        content = orjson.dumps(body)
+        for attempt in range(PLAID_MAX_RETRIES + 1):
+            response = await self._http.post(
+                path,
+                content=content,
+                headers={'Content-Type': 'application/json'}
+            )
+            if response.status_code not in PLAID_RETRY_STATUSES or attempt == PLAID_MAX_RETRIES:
+                break
+            logger.warning(f"Plaid {path} returned {response.status_code}, retrying")
+            await asyncio.sleep(PLAID_RETRY_BACKOFF * 2 ** attempt)
+        if response.is_error:
+            # Error bodies are usually Plaid JSON, but gateways may return HTML
+            try:
+                message = orjson.loads(response.content).get('error_message')
+            except (orjson.JSONDecodeError, AttributeError):
+                message = None
+            raise Exception(f"Plaid API returned {response.status_code}: {message or response.reason_phrase}")
+        return orjson.loads(response.content)
     
     async def create_link_token(self, user_id: str, user_email: str) -> str:
         """
@@ -85,15 +235,15 @@ class PlaidService:
         """
         try:
             request = LinkTokenCreateRequest(
-                products=[Products(prod) for prod in settings.plaid_products],
+                products=list(PLAID_PRODUCTS),
                 client_name="Finance Tracker",
-                country_codes=[CountryCode(code) for code in settings.plaid_country_codes],
+                country_codes=list(PLAID_COUNTRY_CODES),
                 language='en',
                 user=LinkTokenCreateRequestUser(client_user_id=user_id),
                 webhook='https://your-webhook-url.com/plaid/webhook'  # Replace with actual webhook URL
             )
             
-            response = self.client.link_token_create(request)
+            response = await asyncio.to_thread(self.client.link_token_create, request)
             return response['link_token']
             
         except Exception as e:
@@ -112,7 +262,7 @@ class PlaidService:
         """
         try:
             request = ItemPublicTokenExchangeRequest(public_token=public_token)
-            response = self.client.item_public_token_exchange(request)
+            response = await asyncio.to_thread(self.client.item_public_token_exchange, request)
             return response['access_token']
             
         except Exception as e:
@@ -131,78 +281,60 @@ class PlaidService:
         """
         try:
             request = AccountsGetRequest(access_token=access_token)
-            response = self.client.accounts_get(request)
+            response = await asyncio.to_thread(self.client.accounts_get, request)
             return response['accounts']
             
         except Exception as e:
             logger.error(f"Error getting accounts: {e}")
             raise Exception(f"Failed to get accounts: {str(e)}")
     
-    async def get_transactions(
-        self, 
-        access_token: str, 
-        start_date: date, 
-        end_date: date,
-        account_ids: Optional[List[str]] = None
-    ) -> List[Dict[str, Any]]:
+    async def get_transaction_updates(
+        self,
+        access_token: str,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], List[str], Optional[str]]:
         """
-        Get transactions from Plaid.
+        Get transaction changes from Plaid since the given sync cursor.
         
         Args:
             access_token: Plaid access token
-            start_date: Start date for transactions
-            end_date: End date for transactions
-            account_ids: Optional list of specific account IDs
+            cursor: Cursor from the previous sync, or None for the full history
             
         Returns:
-            List of transaction data
+            Added and modified transactions, removed transaction IDs, and the
+            cursor to store for the next sync
         """
         try:
-            # Build request parameters
-            request_params = {
-                'access_token': access_token,
-                'start_date': start_date,
-                'end_date': end_date
-            }
-            
-            # Only add account_ids if provided
-            if account_ids is not None:
-                request_params['account_ids'] = account_ids
-            
-            request = TransactionsGetRequest(**request_params)
-            
-            response = self.client.transactions_get(request)
-            
-            # Handle response safely
-            if not response or 'transactions' not in response:
-                logger.warning("No transactions returned from Plaid API")
-                return []
-            
-            transactions = response['transactions']
-            total_transactions = response.get('total_transactions', len(transactions))
-            
-            logger.info(f"Retrieved {len(transactions)} of {total_transactions} transactions")
-            
-            # Handle pagination if there are more transactions
-            while len(transactions) < total_transactions:
-                request.offset = len(transactions)
-                response = self.client.transactions_get(request)
+            changed = []
+            removed = []
+            has_more = True
+            while has_more:
+                payload = {'access_token': access_token, 'count': PLAID_TRANSACTIONS_PAGE_SIZE}
+                if cursor:
+                    payload['cursor'] = cursor
+                response = await self._post('/transactions/sync', payload)
                 
-                if response and 'transactions' in response:
-                    transactions.extend(response['transactions'])
-                else:
-                    logger.warning("Failed to get additional transactions during pagination")
-                    break
+                changed.extend(response['added'])
+                changed.extend(response['modified'])
+                removed.extend(t['transaction_id'] for t in response['removed'])
+                has_more = response['has_more']
+                cursor = response['next_cursor']
             
-            logger.info(f"Total transactions retrieved: {len(transactions)}")
-            return transactions
+            logger.info(f"Retrieved {len(changed)} changed and {len(removed)} removed transactions")
+            return changed, removed, cursor
             
         except Exception as e:
-            logger.error(f"Error getting transactions: {e}")
-            logger.error(f"Request params: access_token={'***' if access_token else None}, start_date={start_date}, end_date={end_date}, account_ids={account_ids}")
-            raise Exception(f"Failed to get transactions: {str(e)}")
+            logger.error(f"Error getting transaction updates: {e}")
+            raise Exception(f"Failed to get transaction updates: {str(e)}")
     
-    async def sync_user_accounts(self, db: AsyncSession, user: User, access_token: str) -> List[Account]:
+    async def sync_user_accounts(
+        self,
+        db: AsyncSession,
+        user: User,
+        access_token: str,
+        institution_id: Optional[str] = None,
+        institution_name: Optional[str] = None
+    ) -> List[Account]:
         """
         Sync user accounts from Plaid to database.
         
@@ -210,6 +342,8 @@ class PlaidService:
             db: Database session
             user: User object
             access_token: Plaid access token
+            institution_id: Institution ID from Plaid Link, stored when given
+            institution_name: Institution name from Plaid Link, stored when given
             
         Returns:
             List of synced accounts
@@ -217,85 +351,40 @@ class PlaidService:
         try:
             # Get accounts from Plaid
             plaid_accounts = await self.get_accounts(access_token)
-            synced_accounts = []
+            if not plaid_accounts:
+                return []
             
+            sync_time = datetime.utcnow()
+            upsert_columns = ACCOUNT_UPSERT_COLUMNS
+            institution = {}
+            if institution_id or institution_name:
+                institution = {'institution_id': institution_id, 'institution_name': institution_name}
+                upsert_columns += tuple(institution)
+            rows = {}
             for plaid_account in plaid_accounts:
-                # Check if account already exists
-                result = await db.execute(
-                    select(Account).where(Account.plaid_account_id == plaid_account['account_id'])
-                )
-                existing_account = result.scalar_one_or_none()
-                
-                if existing_account:
-                    # Update existing account
-                    existing_account.account_name = plaid_account['name']
-                    existing_account.account_type = str(plaid_account['type'])
-                    existing_account.account_subtype = str(plaid_account.get('subtype')) if plaid_account.get('subtype') else None
-                    existing_account.official_name = plaid_account.get('official_name')
-                    existing_account.mask = plaid_account.get('mask')
-                    
-                    # Update balances
-                    balances = plaid_account.get('balances', {})
-                    existing_account.current_balance = Decimal(str(balances.get('current', 0)))
-                    existing_account.available_balance = Decimal(str(balances.get('available', 0)))
-                    existing_account.credit_limit = Decimal(str(balances.get('limit', 0))) if balances.get('limit') else None
-                    
-                    existing_account.last_sync = datetime.utcnow()
-                    # Convert plaid_account to a serializable dict
-                    serializable_metadata = {
-                        'account_id': plaid_account['account_id'],
-                        'name': plaid_account['name'],
-                        'type': str(plaid_account['type']),
-                        'subtype': str(plaid_account.get('subtype')) if plaid_account.get('subtype') else None,
-                        'official_name': plaid_account.get('official_name'),
-                        'mask': plaid_account.get('mask'),
-                        'balances': {
-                            'current': balances.get('current'),
-                            'available': balances.get('available'),
-                            'limit': balances.get('limit'),
-                            'iso_currency_code': balances.get('iso_currency_code')
-                        }
-                    }
-                    existing_account.plaid_metadata = serializable_metadata
-                    
-                    synced_accounts.append(existing_account)
-                    
-                else:
-                    # Create new account
-                    balances = plaid_account.get('balances', {})
-                    # Convert plaid_account to a serializable dict
-                    serializable_metadata = {
-                        'account_id': plaid_account['account_id'],
-                        'name': plaid_account['name'],
-                        'type': str(plaid_account['type']),
-                        'subtype': str(plaid_account.get('subtype')) if plaid_account.get('subtype') else None,
-                        'official_name': plaid_account.get('official_name'),
-                        'mask': plaid_account.get('mask'),
-                        'balances': {
-                            'current': balances.get('current'),
-                            'available': balances.get('available'),
-                            'limit': balances.get('limit'),
-                            'iso_currency_code': balances.get('iso_currency_code')
-                        }
-                    }
-                    new_account = Account(
-                        user_id=user.id,
-                        plaid_account_id=plaid_account['account_id'],
-                        account_name=plaid_account['name'],
-                        account_type=str(plaid_account['type']),
-                        account_subtype=str(plaid_account.get('subtype')) if plaid_account.get('subtype') else None,
-                        official_name=plaid_account.get('official_name'),
-                        current_balance=Decimal(str(balances.get('current', 0))),
-                        available_balance=Decimal(str(balances.get('available', 0))),
-                        credit_limit=Decimal(str(balances.get('limit', 0))) if balances.get('limit') else None,
-                        mask=plaid_account.get('mask'),
-                        currency_code=balances.get('iso_currency_code', 'USD'),
-                        last_sync=datetime.utcnow(),
-                        plaid_metadata=serializable_metadata
-                    )
-                    
-                    db.add(new_account)
-                    synced_accounts.append(new_account)
+                balances = plaid_account.get('balances', {})
+                metadata = _build_account_metadata(plaid_account)
+                rows[plaid_account['account_id']] = {
+                    'user_id': user.id,
+                    'plaid_account_id': plaid_account['account_id'],
+                    'account_name': plaid_account['name'],
+                    'account_type': metadata['type'],
+                    'account_subtype': metadata['subtype'],
+                    'official_name': plaid_account.get('official_name'),
+                    'current_balance': _to_decimal(balances.get('current', 0)),
+                    'available_balance': _to_decimal(balances.get('available', 0)),
+                    'credit_limit': _to_decimal(balances.get('limit')),
+                    'mask': plaid_account.get('mask'),
+                    'currency_code': balances.get('iso_currency_code', 'USD'),
+                    'last_sync': sync_time,
+                    'plaid_metadata': metadata,
+                    **institution,
+                }
+            
+            # Insert new accounts and update existing ones
+            synced_accounts = await self._upsert(
+                db, Account, list(rows.values()), Account.plaid_account_id, upsert_columns
+            )
             
             await db.commit()
             return synced_accounts
@@ -305,97 +394,101 @@ class PlaidService:
             await db.rollback()
             raise Exception(f"Failed to sync accounts: {str(e)}")
     
+    async def _get_accounts_by_plaid_id(self, db: AsyncSession, plaid_account_ids) -> Dict[str, Account]:
+        """Load accounts by Plaid account ID, keyed by that ID."""
+        result = await db.execute(
+            select(Account).where(Account.plaid_account_id.in_(plaid_account_ids))
+        )
+        return {account.plaid_account_id: account for account in result.scalars().all()}
+    
     async def sync_user_transactions(
         self, 
         db: AsyncSession, 
         user: User, 
-        access_token: str,
-        days_back: int = 30
-    ) -> List[Transaction]:
+        access_token: str
+    ) -> List[UUID]:
         """
         Sync user transactions from Plaid to database.
         
+        Only changes since the user's stored sync cursor are fetched; the
+        first sync pulls the full available history.
+        
         Args:
             db: Database session
             user: User object
             access_token: Plaid access token
-            days_back: Number of days to sync back
             
         Returns:
-            List of synced transactions
+            IDs of the added or updated transactions
         """
         try:
-            # Calculate date range
-            end_date = date.today()
-            start_date = end_date - timedelta(days=days_back)
+            plaid_transactions, removed_ids, next_cursor = await self.get_transaction_updates(
+                access_token, user.plaid_transactions_cursor
+            )
             
-            # Get transactions from Plaid
-            plaid_transactions = await self.get_transactions(access_token, start_date, end_date)
-            synced_transactions = []
+            # Resolve the accounts referenced by these transactions in one query
+            account_ids = {t['account_id'] for t in plaid_transactions}
+            accounts = await self._get_accounts_by_plaid_id(db, account_ids)
+            missing_account_ids = account_ids - accounts.keys()
+            if missing_account_ids:
+                # Accounts opened since the last account sync; fetch them and resolve again
+                await self.sync_user_accounts(db, user, access_token)
+                accounts.update(await self._get_accounts_by_plaid_id(db, missing_account_ids))
             
+            rows = {}
+            skipped_ids = []
             for plaid_transaction in plaid_transactions:
-                # Check if transaction already exists
-                result = await db.execute(
-                    select(Transaction).where(
-                        Transaction.plaid_transaction_id == plaid_transaction['transaction_id']
-                    )
-                )
-                existing_transaction = result.scalar_one_or_none()
+                account = accounts.get(plaid_transaction['account_id'])
+                if not account:
+                    skipped_ids.append(plaid_transaction['transaction_id'])
+                    continue
                 
-                if existing_transaction:
-                    # Update existing transaction
-                    existing_transaction.amount = Decimal(str(plaid_transaction['amount']))
-                    existing_transaction.name = plaid_transaction['name']
-                    existing_transaction.merchant_name = plaid_transaction.get('merchant_name')
-                    existing_transaction.category = plaid_transaction.get('category')
-                    existing_transaction.category_id = plaid_transaction.get('category_id')
-                    existing_transaction.pending = plaid_transaction.get('pending', False)
-                    existing_transaction.location = None  # Skip location for now
-                    existing_transaction.plaid_metadata = None  # Skip metadata for now
-                    
-                    synced_transactions.append(existing_transaction)
-                    
-                else:
-                    # Get account for this transaction
-                    account_result = await db.execute(
-                        select(Account).where(
-                            Account.plaid_account_id == plaid_transaction['account_id']
-                        )
+                amount = plaid_transaction['amount']
+                rows[plaid_transaction['transaction_id']] = {
+                    'user_id': user.id,
+                    'account_id': account.id,
+                    'plaid_transaction_id': plaid_transaction['transaction_id'],
+                    'plaid_account_id': plaid_transaction['account_id'],
+                    'amount': _to_decimal(amount),
+                    'iso_currency_code': plaid_transaction.get('iso_currency_code', 'USD'),
+                    'name': plaid_transaction['name'],
+                    'merchant_name': plaid_transaction.get('merchant_name'),
+                    'date': _parse_date(plaid_transaction.get('date')) or date.today(),
+                    'authorized_date': _parse_date(plaid_transaction.get('authorized_date')),
+                    'category': plaid_transaction.get('category'),
+                    'category_id': plaid_transaction.get('category_id'),
+                    'transaction_type': "debit" if amount > 0 else "credit",
+                    'pending': plaid_transaction.get('pending', False),
+                    'location': None,  # Skip location for now to avoid serialization issues
+                    'plaid_metadata': None,  # Skip metadata for now to avoid serialization issues
+                }
+            
+            # Insert new transactions and update existing ones; only IDs are
+            # returned, as a full history sync can touch thousands of rows
+            synced_ids = await self._upsert(
+                db, Transaction, list(rows.values()), Transaction.plaid_transaction_id,
+                TRANSACTION_UPSERT_COLUMNS, returning=Transaction.id
+            )
+            if synced_ids:
+                logger.info(f"Upserted {len(synced_ids)} transactions")
+            
+            if removed_ids:
+                await db.execute(
+                    delete(Transaction).where(
+                        Transaction.user_id == user.id,
+                        Transaction.plaid_transaction_id.in_(removed_ids)
                     )
-                    account = account_result.scalar_one_or_none()
-                    
-                    if account:
-                        # Log category information for debugging
-                        logger.info(f"Creating transaction: {plaid_transaction['name']}")
-                        logger.info(f"  Plaid category: {plaid_transaction.get('category')}")
-                        logger.info(f"  Plaid category_id: {plaid_transaction.get('category_id')}")
-                        logger.info(f"  Amount: {plaid_transaction['amount']}")
-                        
-                        # Create new transaction
-                        new_transaction = Transaction(
-                            user_id=user.id,
-                            account_id=account.id,
-                            plaid_transaction_id=plaid_transaction['transaction_id'],
-                            plaid_account_id=plaid_transaction['account_id'],
-                            amount=Decimal(str(plaid_transaction['amount'])),
-                            iso_currency_code=plaid_transaction.get('iso_currency_code', 'USD'),
-                            name=plaid_transaction['name'],
-                            merchant_name=plaid_transaction.get('merchant_name'),
-                            date=plaid_transaction['date'] if isinstance(plaid_transaction.get('date'), date) else datetime.strptime(plaid_transaction['date'], '%Y-%m-%d').date() if plaid_transaction.get('date') else date.today(),
-                            authorized_date=plaid_transaction['authorized_date'] if isinstance(plaid_transaction.get('authorized_date'), date) else datetime.strptime(plaid_transaction['authorized_date'], '%Y-%m-%d').date() if plaid_transaction.get('authorized_date') else None,
-                            category=plaid_transaction.get('category'),
-                            category_id=plaid_transaction.get('category_id'),
-                            transaction_type="debit" if plaid_transaction['amount'] > 0 else "credit",
-                            pending=plaid_transaction.get('pending', False),
-                            location=None,  # Skip location for now to avoid serialization issues
-                            plaid_metadata=None  # Skip metadata for now to avoid serialization issues
-                        )
-                        
-                        db.add(new_transaction)
-                        synced_transactions.append(new_transaction)
+                )
+                logger.info(f"Removed {len(removed_ids)} transactions")
+            
+            if skipped_ids:
+                # Accounts were just re-synced, so these belong to accounts Plaid
+                # no longer returns; retrying would only re-pull the same history
+                logger.warning(f"Skipped {len(skipped_ids)} transactions with unknown accounts: {skipped_ids}")
             
+            user.plaid_transactions_cursor = next_cursor
             await db.commit()
-            return synced_transactions
+            return synced_ids
             
         except Exception as e:
             logger.error(f"Error syncing transactions: {e}")
@@ -37,23 +37,14 @@ export const PlaidLink: React.FC<PlaidLinkProps> = ({
     try {
       console.log('Plaid connection successful:', metadata);
       
-      // Exchange public token for access token
+      // Exchange public token for access token; the backend then syncs
+      // transactions in the background
       await plaidApi.exchangePublicToken({
         public_token,
         institution_id: metadata.institution.institution_id,
         institution_name: metadata.institution.name,
       });
 
-      // Sync transactions after connecting
-      try {
-        console.log('Syncing transactions...');
-        const syncResult = await plaidApi.syncTransactions(30); // Sync last 30 days
-        console.log('Transactions synced:', syncResult);
-      } catch (syncError) {
-        console.error('Error syncing transactions:', syncError);
-        // Don't fail the connection if transaction sync fails
-      }
-
       // Refresh plaid status and dashboard data
       queryClient.invalidateQueries('plaid-status');
       queryClient.invalidateQueries('dashboard');
@@ -1,4 +1,4 @@
-import React from 'react';
+import React, { useEffect, useRef } from 'react';
 import { useQuery, useQueryClient } from 'react-query';
 import { 
   DollarSign, 
@@ -35,6 +35,16 @@ export const Dashboard: React.FC = () => {
     }
   );
 
+  // Reload dashboard data once the background transaction sync after linking finishes
+  const transactionsSynced = plaidStatus?.transactions_synced;
+  const wasSynced = useRef(transactionsSynced);
+  useEffect(() => {
+    if (transactionsSynced && wasSynced.current === false) {
+      queryClient.invalidateQueries('dashboard-data');
+    }
+    wasSynced.current = transactionsSynced;
+  }, [transactionsSynced, queryClient]);
+
   // Debug logging
   console.log('Dashboard Debug:', {
     plaidStatus,
@@ -164,7 +174,7 @@ export const Dashboard: React.FC = () => {
               onClick={async () => {
                 try {
                   console.log('Starting transaction sync...');
-                  const result = await plaidApi.syncTransactions(30);
+                  const result = await plaidApi.syncTransactions();
                   console.log('Sync result:', result);
                   alert(`Successfully synced ${result.transactions_synced} transactions!`);
                   // Refresh dashboard data and plaid status
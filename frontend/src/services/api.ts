@@ -85,6 +85,7 @@ interface PlaidConnection {
   institution_name?: string;
   accounts_count?: number;
   last_sync?: string;
+  transactions_synced?: boolean;
 }
 
 interface Budget {
@@ -172,8 +173,8 @@ export const plaidApi = {
     return response.data;
   },
 
-  syncTransactions: async (daysBack: number = 30): Promise<{ message: string; transactions_synced: number }> => {
-    const response = await apiClient.post('/plaid/sync-transactions', { days_back: daysBack });
+  syncTransactions: async (): Promise<{ message: string; transactions_synced: number }> => {
+    const response = await apiClient.post('/plaid/sync-transactions');
     return response.data;
   },
 